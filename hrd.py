@@ -1,462 +1,634 @@
-import argparse
-import sys
-import copy
-import heapq
-import uuid
-
-#====================================================================================
-
-char_single = '2'
-char_empty = '.'
-
-class Piece:
-    """
-    This represents a piece on the Hua Rong Dao puzzle.
-    """
-
-    def __init__(self, is_2_by_2, is_single, coord_x, coord_y, orientation, uid=None):
-        """
-        :param is_2_by_2: True if the piece is a 2x2 piece and False otherwise.
-        :type is_2_by_2: bool
-        :param is_single: True if this piece is a 1x1 piece and False otherwise.
-        :type is_single: bool
-        :param coord_x: The x coordinate of the top left corner of the piece.
-        :type coord_x: int
-        :param coord_y: The y coordinate of the top left corner of the piece.
-        :type coord_y: int
-        :param orientation: The orientation of the piece (one of 'h' or 'v') 
-            if the piece is a 1x2 piece. Otherwise, this is None
-        :type orientation: str
-        """
-
-        self.is_2_by_2 = is_2_by_2
-        self.is_single = is_single
-        self.coord_x = coord_x
-        self.coord_y = coord_y
-        self.orientation = orientation
-        if uid:
-            self.uid = uid
-        else:
-            self.uid = uuid.uuid4()
-
-    def set_coords(self, coord_x, coord_y):
-        """
-        Move the piece to the new coordinates. 
-
-        :param coord: The new coordinates after moving.
-        :type coord: int
-        """
-
-        self.coord_x = coord_x
-        self.coord_y = coord_y
-
-    def __repr__(self):
-        return '{} {} {} {} {}'.format(self.is_2_by_2, self.is_single, \
-            self.coord_x, self.coord_y, self.orientation)
-
-class Board:
-    """
-    Board class for setting up the playing board.
-    """
-
-    def __init__(self, height, pieces, goal_board_dict = None):
-        """
-        :param pieces: The list of Pieces
-        :type pieces: List[Piece]
-        """
-
-        self.width = 4
-        self.height = height
-        self.pieces = pieces
-        self.goal_board_dict = goal_board_dict
-
-        # self.grid is a 2-d (size * size) array automatically generated
-        # using the information on the pieces when a board is being created.
-        # A grid contains the symbol for representing the pieces on the board.
-        self.grid = []
-        self.update_grid()
-
-    # customized eq for object comparison.
-    def __eq__(self, other):
-        if isinstance(other, Board):
-            return self.grid == other.grid
-        return False
-    
-    def __str__(self):
-        string = ""
-        for arr in self.grid:
-            string += str(arr)
-        return string
-
-    def copy_board(self, new_key, old):
-        pieces = {}
-        for piece_key in self.pieces:
-            piece = self.pieces[piece_key]
-            pieces[piece_key] = Piece(piece.is_2_by_2, piece.is_single, piece.coord_x, piece.coord_y, piece.orientation, piece.uid)
-        
-        board = Board(self.height, pieces, self.goal_board_dict)
-        board.pieces[new_key] = board.pieces.pop(old)
-        pieces[new_key].set_coords(new_key[0], new_key[1])
-        board.update_grid()
-        return board
-
-    def update_grid(self):
-        """
-        Called in __init__ to set up a 2-d grid based on the piece location information.
-
-        """
-        self.grid = [['.'] * self.width for _ in range(self.height)]
-        for piece in list(self.pieces.values()):
-            if piece.is_2_by_2:
-                self.grid[piece.coord_y][piece.coord_x] = '1'
-                self.grid[piece.coord_y][piece.coord_x + 1] = '1'
-                self.grid[piece.coord_y + 1][piece.coord_x] = '1'
-                self.grid[piece.coord_y + 1][piece.coord_x + 1] = '1'
-            elif piece.is_single:
-                self.grid[piece.coord_y][piece.coord_x] = char_single
-            else:
-                if piece.orientation == 'h':
-                    self.grid[piece.coord_y][piece.coord_x] = '<'
-                    self.grid[piece.coord_y][piece.coord_x + 1] = '>'
-                elif piece.orientation == 'v':
-                    self.grid[piece.coord_y][piece.coord_x] = '^'
-                    self.grid[piece.coord_y + 1][piece.coord_x] = 'v'
-      
-    def display(self):
-        """
-        Print out the current board.
-
-        """
-        for i, line in enumerate(self.grid):
-            for ch in line:
-                print(ch, end='')
-            print()
-        
-
-class State:
-    """
-    State class wrapping a Board with some extra current state information.
-    Note that State and Board are different. Board has the locations of the pieces. 
-    State has a Board and some extra information that is relevant to the search: 
-    heuristic function, f value, current depth and parent.
-    """
-
-    def __init__(self, board, hfn=0, f=0, depth=0, parent=None):
-        """
-        :param board: The board of the state.
-        :type board: Board
-        :param hfn: The heuristic function.
-        :type hfn: Optional[Heuristic]
-        :param f: The f value of current state.
-        :type f: int
-        :param depth: The depth of current state in the search tree.
-        :type depth: int
-        :param parent: The parent of current state.
-        :type parent: Optional[State]
-        """
-        self.board = board
-        self.hfn = hfn
-        self.f = f
-        self.depth = depth
-        self.parent = parent
-    
-    def __lt__(self, other):
-        return self.f < other.f    
-
-    def generate_successors(self):
-        new_states = []
-        
-        for piece in self.board.pieces.values():
-            new_keys = []
-            new_key = None
-            x = piece.coord_x
-            y = piece.coord_y
-
-            if piece.is_2_by_2:
-                if (x - 1) >= 0:
-                    if (self.board.grid[y][x - 1] == char_empty) and (self.board.grid[y + 1][x - 1] == char_empty):
-                        new_keys.append((x - 1, y))
-                
-                if (y - 1) >= 0:
-                    if (self.board.grid[y - 1][x] == char_empty) and (self.board.grid[y - 1][x + 1] == char_empty):
-                        new_keys.append((x, y - 1))
-                
-                if (x + 2) < self.board.width:
-                    if (self.board.grid[y][x + 2] == char_empty) and (self.board.grid[y + 1][x + 2] == char_empty):
-                        new_keys.append((x + 1, y))
-                        
-                if (y + 2) < self.board.height:
-                    if (self.board.grid[y + 2][x] == char_empty) and (self.board.grid[y + 2][x + 1] == char_empty):
-                        new_keys.append((x, y + 1))
-                        
-            elif piece.is_single:
-                if (x - 1) >= 0:
-                    if (self.board.grid[y][x - 1] == char_empty):
-                        new_keys.append((x - 1, y))
-                
-                if (y - 1) >= 0:
-                    if (self.board.grid[y - 1][x] == char_empty):
-                        new_keys.append((x, y - 1))
-                        
-                if (x + 1) < self.board.width:
-                    if (self.board.grid[y][x + 1] == char_empty):
-                        new_keys.append((x + 1, y))
-                
-                if (y + 1) < self.board.height:
-                    if (self.board.grid[y + 1][x] == char_empty):
-                        new_keys.append((x, y + 1))
-            
-            elif piece.orientation == 'h':
-                if (x - 1) >= 0:
-                    if (self.board.grid[y][x - 1] == char_empty):
-                        new_keys.append((x - 1, y))
-            
-                if (y - 1) >= 0:
-                    if (self.board.grid[y - 1][x] == char_empty) and (self.board.grid[y - 1][x + 1] == char_empty):
-                        new_keys.append((x, y - 1))
-            
-                if (x + 2) < self.board.width:
-                    if (self.board.grid[y][x + 2] == char_empty):
-                        new_keys.append((x + 1, y))
-            
-                if (y + 1) < self.board.height:
-                    if (self.board.grid[y + 1][x] == char_empty) and (self.board.grid[y + 1][x + 1] == char_empty):
-                        new_keys.append((x, y + 1))
-            
-            else:
-                if (x - 1) >= 0:
-                    if (self.board.grid[y][x - 1] == char_empty) and (self.board.grid[y + 1][x - 1] == char_empty):
-                        new_keys.append((x - 1, y)) 
-            
-                if (y - 1) >= 0:
-                    if (self.board.grid[y - 1][x] == char_empty):
-                        new_keys.append((x, y - 1))
-            
-                if (x + 1) < self.board.width:
-                    if (self.board.grid[y][x + 1] == char_empty) and (self.board.grid[y + 1][x + 1] == char_empty):
-                        new_keys.append((x + 1, y))
-            
-                if (y + 2) < self.board.height:
-                    if (self.board.grid[y + 2][x] == char_empty):
-                        new_keys.append((x, y + 1))
-                    
-            for new_key in new_keys:
-                goal_piece = self.board.goal_board_dict[piece.uid]
-                old_man_dist = abs(x - goal_piece.coord_x) + abs(y - goal_piece.coord_y)
-                new_man_dist = abs(new_key[0] - goal_piece.coord_x) + abs(new_key[1] - goal_piece.coord_y)
-                board = self.board.copy_board(new_key, (x, y))
-                new_states.append(State(board, (self.hfn - old_man_dist) + new_man_dist, self.f, self.depth + 1, self))
-
-        return new_states
-
-def read_from_file(filename):
-    """
-    Load initial board from a given file.
-
-    :param filename: The name of the given file.
-    :type filename: str
-    :return: A loaded board
-    :rtype: Board
-    """
-    goal_board_dict = {}
-    puzzle_file = open(filename, "r")
-    singles = []
-    vert = []
-    hori = []
-    double = None
-
-    line_index = 0
-    pieces = {}
-    final_pieces = {}
-    final = False
-    found_2by2 = False
-    finalfound_2by2 = False
-    height_ = 0
-
-    for line in puzzle_file:
-        height_ += 1
-        if line == '\n':
-            if not final:
-                height_ = 0
-                final = True
-                line_index = 0
-            continue
-        if not final: #initial board
-            for x, ch in enumerate(line):
-                if ch == '^': # found vertical piece
-                    piece = Piece(False, False, x, line_index, 'v')
-                    pieces[(x, line_index)] = piece
-                    vert.append(piece)
-                elif ch == '<': # found horizontal piece
-                    piece = Piece(False, False, x, line_index, 'h')
-                    pieces[(x, line_index)] = piece
-                    hori.append(piece)
-                elif ch == char_single:
-                    piece = Piece(False, True, x, line_index, None)
-                    pieces[(x, line_index)] = piece
-                    singles.append(piece)                
-                elif ch == '1':
-                    if found_2by2 == False:
-                        piece = Piece(True, False, x, line_index, None)
-                        pieces[(x, line_index)] = piece
-                        double = piece
-                        found_2by2 = True
-
-        else: #goal board
-            for x, ch in enumerate(line):
-                if ch == '^': # found vertical piece
-                    uid = vert.pop(find_min_index(vert, x, line_index)).uid
-                    piece = Piece(False, False, x, line_index, 'v', uid)
-                    final_pieces[(x, line_index)] = piece
-                    goal_board_dict[uid] = piece
-                elif ch == '<': # found horizontal piece
-                    uid = hori.pop(find_min_index(hori, x, line_index)).uid
-                    piece = Piece(False, False, x, line_index, 'h', uid)
-                    final_pieces[(x, line_index)] = piece
-                    goal_board_dict[uid] = piece                    
-                elif ch == char_single:
-                    uid = singles.pop(find_min_index(singles, x, line_index)).uid
-                    piece = Piece(False, True, x, line_index, None, uid)
-                    final_pieces[(x, line_index)] = piece 
-                    goal_board_dict[uid] = piece
-                elif ch == '1':
-                    if finalfound_2by2 == False:
-                        piece = Piece(True, False, x, line_index, None, double.uid)
-                        final_pieces[(x, line_index)] = piece
-                        goal_board_dict[double.uid] = piece
-                        finalfound_2by2 = True
-        line_index += 1
-        
-    puzzle_file.close()
-    board = Board(height_, pieces, goal_board_dict)
-    goal_board = Board(height_, final_pieces)
-    return board, goal_board
-
-def find_min_index(arr, x, y):
-    min_i = 0
-    min_dist = float('inf')
-    for i in range(len(arr)):
-        piece = arr[i]
-        new_dist = (abs(x - piece.coord_x) + abs(y - piece.coord_y))
-        if new_dist < min_dist:
-            min_dist = new_dist
-            min_i = i
-    return min_i
-
-
-def grid_to_string(grid):
-    string = ""
-    for i, line in enumerate(grid):
-        for ch in line:
-            string += ch
-        string += "\n"
-    return string
-
-def init_manhattan_distance(board, goal_board):
-    total = 0
-    
-    for piece in board.pieces.values():
-        for goal_piece in goal_board.pieces.values():
-            if piece.uid == goal_piece.uid:
-                total += abs(goal_piece.coord_x - piece.coord_x) + abs(goal_piece.coord_y - piece.coord_y)
-                
-    return total
-
-def astar(initial, goal_board):
-    heap_lst = []
-    heapq.heappush(heap_lst, (initial.f, initial))
-    
-    visited = set()
-    
-    while heap_lst:
-        curr_f, curr = heapq.heappop(heap_lst)
-        
-        if str(curr.board) not in visited:
-            visited.add(str(curr.board))
-            
-            if curr.board == goal_board:
-                return curr            
-            
-            successors = curr.generate_successors()
-            for state in successors:
-                if str(state.board) not in visited:
-                    state.f = state.depth + state.hfn
-                    heapq.heappush(heap_lst, (state.f, state))
-    return None
-                    
-
-def dfs(initial, goal_board):
-    stack = [initial]
-    visited = set()
-
-    while stack:
-        curr = stack.pop()
-        if str(curr.board) not in visited:
-            visited.add(str(curr.board))
-
-            if curr.board == goal_board:
-                return curr
-            
-            successors = curr.generate_successors()
-            for state in successors:
-                if str(state.board) not in visited:
-                    stack.append(state)
-    return None
-    
-
-def output_solution(board, goal_board, algo, output_file):
-    states = []
-    original_stdout = sys.stdout
-
-    if algo == 'dfs':
-        initial = State(board)
-        state = dfs(initial, goal_board)
-    else:
-        man_dist = init_manhattan_distance(board, goal_board)
-        initial = State(board, man_dist, man_dist, 0)
-        state = astar(initial, goal_board)
-        
-    
-    with open(output_file, 'w') as sys.stdout:
-        if state:
-            while state:
-                states.append(state)
-                state = state.parent
-            
-            states = states[::-1]
-            
-            for state in states:
-                    state.board.display()
-                    print("")    
-        else:
-            print("No solution")
-    
-    sys.stdout = original_stdout
-    
-if __name__ == "__main__":
-
-    parser = argparse.ArgumentParser()
-    parser.add_argument(
-        "--inputfile",
-        type=str,
-        required=True,
-        help="The input file that contains the puzzles."
-    )
-    parser.add_argument(
-        "--outputfile",
-        type=str,
-        required=True,
-        help="The output file that contains the solution."
-    )
-    parser.add_argument(
-        "--algo",
-        type=str,
-        required=True,
-        choices=['astar', 'dfs'],
-        help="The searching algorithm."
-    )
-    args = parser.parse_args()
-
-    # read the board from the file
-    board, goal_board = read_from_file(args.inputfile)
+import argparse
+import sys
+import copy
+import heapq
+import itertools
+
+from hrd_jit import gen_moves, SIZES, KIND_2_BY_2, KIND_SINGLE, KIND_H, KIND_V
+
+#====================================================================================
+
+char_single = '2'
+char_empty = '.'
+
+# The board is packed into a single int with 3 bits per cell (cell index
+# y * 4 + x), using the positions below as cell codes. A separate bitmask
+# with one bit per cell tracks which cells are empty.
+cell_bytes = b'.12<>^v'
+
+# For each piece kind (indexed by the kernel's KIND_* codes), the
+# (dx, dy, code) cells the piece covers relative to its top-left anchor.
+kind_cells = (
+    ((0, 0, 1), (1, 0, 1), (0, 1, 1), (1, 1, 1)),
+    ((0, 0, 2),),
+    ((0, 0, 3), (1, 0, 4)),
+    ((0, 0, 5), (0, 1, 6)),
+)
+
+# Map from the Piece.kind() keys to the kernel's integer codes.
+kind_ids = {'1': KIND_2_BY_2, '2': KIND_SINGLE, 'h': KIND_H, 'v': KIND_V}
+
+# Pieces get small dense int ids in creation order; a puzzle only has a
+# handful of pieces, so these double as cheap dict keys and would index
+# a flat array directly.
+_next_uid = itertools.count()
+
+class Piece:
+    """
+    This represents a piece on the Hua Rong Dao puzzle.
+    """
+
+    __slots__ = ('is_2_by_2', 'is_single', 'coord_x', 'coord_y', 'orientation', 'uid')
+
+    def __init__(self, is_2_by_2, is_single, coord_x, coord_y, orientation, uid=None):
+        """
+        :param is_2_by_2: True if the piece is a 2x2 piece and False otherwise.
+        :type is_2_by_2: bool
+        :param is_single: True if this piece is a 1x1 piece and False otherwise.
+        :type is_single: bool
+        :param coord_x: The x coordinate of the top left corner of the piece.
+        :type coord_x: int
+        :param coord_y: The y coordinate of the top left corner of the piece.
+        :type coord_y: int
+        :param orientation: The orientation of the piece (one of 'h' or 'v') 
+            if the piece is a 1x2 piece. Otherwise, this is None
+        :type orientation: str
+        """
+
+        self.is_2_by_2 = is_2_by_2
+        self.is_single = is_single
+        self.coord_x = coord_x
+        self.coord_y = coord_y
+        self.orientation = orientation
+        if uid is not None:
+            self.uid = uid
+        else:
+            self.uid = next(_next_uid)
+
+    def kind(self):
+        """
+        Return the piece kind key ('1', '2', 'h' or 'v') used to look up
+        the cells the piece covers.
+        """
+        if self.is_2_by_2:
+            return '1'
+        if self.is_single:
+            return '2'
+        return self.orientation
+
+    def set_coords(self, coord_x, coord_y):
+        """
+        Move the piece to the new coordinates. 
+
+        :param coord: The new coordinates after moving.
+        :type coord: int
+        """
+
+        self.coord_x = coord_x
+        self.coord_y = coord_y
+
+    def __repr__(self):
+        return '{} {} {} {} {}'.format(self.is_2_by_2, self.is_single, \
+            self.coord_x, self.coord_y, self.orientation)
+
+class Board:
+    """
+    Board class for setting up the playing board.
+    """
+
+    __slots__ = ('width', 'height', 'pieces', 'goal_pieces', 'xs', 'ys', 'kinds',
+                 'patterns', 'occs', 'hash', 'empty', 'h_table')
+
+    def __init__(self, height, pieces, goal_pieces = None):
+        """
+        :param pieces: The list of Pieces, indexed by piece uid.
+        :type pieces: List[Piece]
+        :param goal_pieces: The goal position of each piece, indexed by
+            piece uid.
+        :type goal_pieces: Optional[List[Piece]]
+        """
+
+        self.width = 4
+        self.height = height
+        self.pieces = pieces
+        self.goal_pieces = goal_pieces
+
+        # self.hash packs the whole board into one int, 3 bits per cell,
+        # so it doubles as an exact state key (no collisions, unlike a
+        # randomized Zobrist key). self.empty has one bit per empty cell.
+        self.hash = 0
+        self.empty = 0
+        self.pack_pieces()
+
+        # Per-piece heuristic lookup table, filled in by read_from_file
+        # once the goal board is known.
+        self.h_table = None
+
+    def clone(self):
+        """
+        Return an independent copy of this board without re-running
+        __init__ (and its full pack_pieces pass). Only the per-move
+        mutable state (xs, ys, hash, empty) is copied; the load-time
+        data that never changes after read_from_file (pieces,
+        goal_pieces, kinds, h_table) is shared.
+
+        :return: A board that can be moved independently of this one.
+        :rtype: Board
+        """
+        board = Board.__new__(Board)
+        board.width = self.width
+        board.height = self.height
+        board.pieces = self.pieces
+        board.goal_pieces = self.goal_pieces
+        board.xs = self.xs[:]
+        board.ys = self.ys[:]
+        board.kinds = self.kinds
+        board.patterns = self.patterns
+        board.occs = self.occs
+        board.hash = self.hash
+        board.empty = self.empty
+        board.h_table = self.h_table
+        return board
+
+    def piece_masks(self, kind, coord_x, coord_y):
+        """
+        Return (pattern, occupied) for a piece of the given kind anchored
+        at the given coordinates: the packed cell codes and the bitmask
+        of cells the piece would cover there.
+        """
+        pattern = 0
+        occupied = 0
+        for dx, dy, code in kind_cells[kind]:
+            idx = (coord_y + dy) * self.width + coord_x + dx
+            pattern |= code << (3 * idx)
+            occupied |= 1 << idx
+        return pattern, occupied
+
+    def pack_pieces(self):
+        """
+        Build the structure-of-arrays piece data (xs, ys, kinds, indexed
+        by uid) and recompute the packed cell encoding and empty mask.
+        Called in __init__; moves afterwards update all of it
+        incrementally. The Piece objects themselves stay untouched after
+        loading and only serve I/O.
+        """
+        self.xs = [piece.coord_x for piece in self.pieces]
+        self.ys = [piece.coord_y for piece in self.pieces]
+        self.kinds = [kind_ids[piece.kind()] for piece in self.pieces]
+
+        # Tabulate piece_masks per (kind, anchor cell) once, so the hot
+        # paths do two list reads per move instead of rebuilding masks.
+        total = self.width * self.height
+        self.patterns = []
+        self.occs = []
+        for kind in range(len(kind_cells)):
+            kind_patterns = [0] * total
+            kind_occs = [0] * total
+            for y in range(self.height - SIZES[kind][1] + 1):
+                for x in range(self.width - SIZES[kind][0] + 1):
+                    pattern, occ = self.piece_masks(kind, x, y)
+                    kind_patterns[y * self.width + x] = pattern
+                    kind_occs[y * self.width + x] = occ
+            self.patterns.append(kind_patterns)
+            self.occs.append(kind_occs)
+
+        self.hash = 0
+        occupied = 0
+        for uid in range(len(self.pieces)):
+            idx = self.ys[uid] * self.width + self.xs[uid]
+            self.hash |= self.patterns[self.kinds[uid]][idx]
+            occupied |= self.occs[self.kinds[uid]][idx]
+        self.empty = ~occupied & ((1 << total) - 1)
+
+    # customized eq for object comparison.
+    def __eq__(self, other):
+        if isinstance(other, Board):
+            return self.hash == other.hash
+        return False
+
+    def to_bytes(self):
+        """
+        Decode the packed cells into a bytearray with one symbol byte per
+        cell, in row-major order.
+        """
+        cells = self.hash
+        buf = bytearray(self.width * self.height)
+        for idx in range(len(buf)):
+            buf[idx] = cell_bytes[(cells >> (3 * idx)) & 7]
+        return buf
+
+    def __str__(self):
+        return self.to_bytes().decode('ascii')
+
+    def apply_move(self, uid, new):
+        """
+        Move a piece to a new anchor in place, XOR-updating the packed
+        cells and the empty mask. Calling it again with the old anchor
+        undoes the move.
+
+        :param uid: The uid of the piece to move.
+        :type uid: int
+        :param new: The (x, y) anchor the piece is moving to.
+        :type new: tuple
+        """
+        kind = self.kinds[uid]
+        old_idx = self.ys[uid] * self.width + self.xs[uid]
+        new_idx = new[1] * self.width + new[0]
+        self.xs[uid] = new[0]
+        self.ys[uid] = new[1]
+        self.hash ^= self.patterns[kind][old_idx] ^ self.patterns[kind][new_idx]
+        self.empty ^= self.occs[kind][old_idx] ^ self.occs[kind][new_idx]
+
+    def display(self):
+        """
+        Print out the current board, decoding it from the packed cells.
+
+        """
+        buf = self.to_bytes()
+        for i in range(self.height):
+            start = i * self.width
+            sys.stdout.write(buf[start:start + self.width].decode('ascii') + '\n')
+
+
+class State:
+    """
+    State class holding the search information for one reached board
+    position: heuristic function, f value, current depth, the move that
+    produced it and the position's packed-cell hash. States carry no
+    Board (the searches thread one shared board through explicitly) and
+    no parent reference (ancestry lives in a came_from dict keyed by
+    hash), so they stay five machine words and expanded states can be
+    garbage collected.
+    """
+
+    __slots__ = ('hfn', 'f', 'depth', 'move', 'hash')
+
+    def __init__(self, hfn, f, depth, move, hash):
+        """
+        :param hfn: The heuristic function.
+        :type hfn: Optional[Heuristic]
+        :param f: The f value of current state.
+        :type f: int
+        :param depth: The depth of current state in the search tree.
+        :type depth: int
+        :param move: The (uid, old, new) move that produced this state
+            from its parent, or None for the root state.
+        :type move: Optional[tuple]
+        :param hash: The packed cell encoding of the board in this state.
+        :type hash: int
+        """
+        self.hfn = hfn
+        self.f = f
+        self.depth = depth
+        self.move = move
+        self.hash = hash
+    
+    def generate_successors(self, board):
+        """
+        Return the successor states of this state; board must be
+        materialized at this state's position.
+        """
+        new_states = []
+
+        # Hoist every per-board lookup out of the move loop so the loop
+        # body touches only local names and indexes flat int lists.
+        xs = board.xs
+        ys = board.ys
+        kinds = board.kinds
+        patterns = board.patterns
+        h_table = board.h_table
+        width = board.width
+        curr_hash = self.hash
+        curr_hfn = self.hfn
+        new_depth = self.depth + 1
+
+        # The board's structure-of-arrays piece data feeds the kernel
+        # directly; all the per-move legality checks happen inside
+        # gen_moves.
+        moves = gen_moves(board.empty, width, board.height, xs, ys, kinds)
+
+        for uid, new_x, new_y in moves:
+            x = xs[uid]
+            y = ys[uid]
+            old_idx = y * width + x
+            new_idx = new_y * width + new_x
+            h_row = h_table[uid]
+            # The child shares this state's board and stores only the
+            # move delta; its hash is the parent encoding with the
+            # moved piece's cells swapped, so no board copy is needed.
+            kind_patterns = patterns[kinds[uid]]
+            new_hash = curr_hash ^ kind_patterns[old_idx] ^ kind_patterns[new_idx]
+            new_hfn = (curr_hfn - h_row[old_idx]) + h_row[new_idx]
+            new_states.append(State(new_hfn, new_depth + new_hfn,
+                                    new_depth, (uid, (x, y), (new_x, new_y)), new_hash))
+
+        return new_states
+
+def read_from_file(filename):
+    """
+    Load initial board from a given file.
+
+    :param filename: The name of the given file.
+    :type filename: str
+    :return: A loaded board
+    :rtype: Board
+    """
+    # Read the whole file once and split it into the initial and goal
+    # blocks on the blank line, instead of walking it line by line with
+    # state flags.
+    with open(filename, "r") as puzzle_file:
+        init_block, goal_block = puzzle_file.read().split('\n\n', 1)
+
+    init_rows = [row for row in init_block.split('\n') if row]
+    goal_rows = [row for row in goal_block.split('\n') if row]
+
+    goal_board_dict = {}
+    singles = []
+    vert = []
+    hori = []
+    double = None
+
+    pieces = []
+    final_pieces = []
+    finalfound_2by2 = False
+    height_ = len(init_rows)
+
+    for line_index, line in enumerate(init_rows):
+        for x, ch in enumerate(line):
+            # Uids are list positions, so pieces is indexed by uid.
+            if ch == '^': # found vertical piece
+                piece = Piece(False, False, x, line_index, 'v', len(pieces))
+                pieces.append(piece)
+                vert.append(piece)
+            elif ch == '<': # found horizontal piece
+                piece = Piece(False, False, x, line_index, 'h', len(pieces))
+                pieces.append(piece)
+                hori.append(piece)
+            elif ch == char_single:
+                piece = Piece(False, True, x, line_index, None, len(pieces))
+                pieces.append(piece)
+                singles.append(piece)
+            elif ch == '1':
+                if double is None:
+                    piece = Piece(True, False, x, line_index, None, len(pieces))
+                    pieces.append(piece)
+                    double = piece
+
+    for line_index, line in enumerate(goal_rows):
+        for x, ch in enumerate(line):
+            if ch == '^': # found vertical piece
+                uid = vert.pop(find_min_index(vert, x, line_index)).uid
+                piece = Piece(False, False, x, line_index, 'v', uid)
+                final_pieces.append(piece)
+                goal_board_dict[uid] = piece
+            elif ch == '<': # found horizontal piece
+                uid = hori.pop(find_min_index(hori, x, line_index)).uid
+                piece = Piece(False, False, x, line_index, 'h', uid)
+                final_pieces.append(piece)
+                goal_board_dict[uid] = piece
+            elif ch == char_single:
+                uid = singles.pop(find_min_index(singles, x, line_index)).uid
+                piece = Piece(False, True, x, line_index, None, uid)
+                final_pieces.append(piece)
+                goal_board_dict[uid] = piece
+            elif ch == '1':
+                if finalfound_2by2 == False:
+                    piece = Piece(True, False, x, line_index, None, double.uid)
+                    final_pieces.append(piece)
+                    goal_board_dict[double.uid] = piece
+                    finalfound_2by2 = True
+
+    goal_pieces = [goal_board_dict[uid] for uid in range(len(pieces))]
+    board = Board(height_, pieces, goal_pieces)
+    goal_board = Board(height_, final_pieces)
+    board.h_table = build_h_table(board, goal_board)
+    return board, goal_board
+
+def find_min_index(arr, x, y):
+    return min(range(len(arr)),
+               key=lambda i: abs(x - arr[i].coord_x) + abs(y - arr[i].coord_y))
+
+
+def build_h_table(board, goal_board):
+    """
+    Precompute the heuristic as a lookup table: for each piece uid, a
+    list over flattened board cells giving the Manhattan distance from
+    that anchor to the nearest goal anchor of the same kind. Taking the
+    nearest same-kind goal (rather than a fixed piece-to-goal matching)
+    keeps the heuristic admissible when identical pieces are
+    interchangeable, so A* solutions are guaranteed shortest.
+
+    :param board: The initial board.
+    :type board: Board
+    :param goal_board: The goal board.
+    :type goal_board: Board
+    :return: The per-cell distance row for each piece, indexed by uid.
+    :rtype: List[List[int]]
+    """
+    goal_anchors = {}
+    for goal_piece in goal_board.pieces:
+        goal_anchors.setdefault(goal_piece.kind(), []).append(
+            (goal_piece.coord_x, goal_piece.coord_y))
+
+    # Rows only depend on the piece kind, so identical pieces share one.
+    kind_rows = {}
+    for kind, anchors in goal_anchors.items():
+        row = []
+        for y in range(board.height):
+            for x in range(board.width):
+                row.append(min(abs(x - gx) + abs(y - gy) for gx, gy in anchors))
+        kind_rows[kind] = row
+
+    return [kind_rows[piece.kind()] for piece in board.pieces]
+
+
+def init_manhattan_distance(board):
+    total = 0
+
+    for uid in range(len(board.pieces)):
+        total += board.h_table[uid][board.ys[uid] * board.width + board.xs[uid]]
+
+    return total
+
+def materialize(board, came_from, from_hash, to_hash):
+    """
+    Bring the shared board from one recorded state to another by undoing
+    moves up to their lowest common ancestor in the came_from tree and
+    replaying the target's moves from there, so the cost is the tree
+    distance between the two states rather than their depths.
+
+    :param board: The shared board.
+    :type board: Board
+    :param came_from: Maps a state hash to (parent_hash, move, depth).
+    :type came_from: dict
+    :param from_hash: The state the board currently reflects.
+    :type from_hash: int
+    :param to_hash: The state the board should reflect.
+    :type to_hash: int
+    """
+    a = from_hash
+    b = to_hash
+    redo = []
+    while came_from[a][2] > came_from[b][2]:
+        parent, move, _ = came_from[a]
+        board.apply_move(move[0], move[1])
+        a = parent
+    while came_from[b][2] > came_from[a][2]:
+        parent, move, _ = came_from[b]
+        redo.append(move)
+        b = parent
+    while a != b:
+        parent, move, _ = came_from[a]
+        board.apply_move(move[0], move[1])
+        a = parent
+        parent, move, _ = came_from[b]
+        redo.append(move)
+        b = parent
+    for uid, old, new in reversed(redo):
+        board.apply_move(uid, new)
+
+
+def astar(board, initial, goal_board):
+    # The heap holds plain int triples (f, -depth, index into entries):
+    # ties on f are broken towards deeper states (closer to the goal),
+    # and the entries index is both the final tie-break and the handle
+    # to the State, so heap comparisons never touch State objects.
+    entries = [initial]
+    heap_lst = []
+    heapq.heappush(heap_lst, (initial.f, -initial.depth, 0))
+
+    # With a consistent heuristic each state needs expanding only once,
+    # so successors are filtered at push time: skip anything already
+    # expanded (closed) and anything OPEN already holds at an equal or
+    # better depth (g_best). Superseded heap entries are simply left to
+    # be discarded on pop.
+    closed = set()
+    g_best = {initial.hash: initial.depth}
+    came_from = {initial.hash: (None, None, initial.depth)}
+    materialized = initial.hash
+
+    while heap_lst:
+        curr = entries[heapq.heappop(heap_lst)[2]]
+
+        if curr.hash not in closed:
+            closed.add(curr.hash)
+            materialize(board, came_from, materialized, curr.hash)
+            materialized = curr.hash
+
+            if curr.hash == goal_board.hash:
+                return curr.hash, came_from
+
+            successors = curr.generate_successors(board)
+            for state in successors:
+                if state.hash in closed:
+                    continue
+                if g_best.get(state.hash, float('inf')) <= state.depth:
+                    continue
+                g_best[state.hash] = state.depth
+                came_from[state.hash] = (curr.hash, state.move, state.depth)
+                entries.append(state)
+                heapq.heappush(heap_lst, (state.f, -state.depth, len(entries) - 1))
+    return None
+                    
+
+def dfs(board, initial, goal_board):
+    # Each state is hashed and pushed at most once: the pushed set is
+    # checked (and extended) at push time, so popped entries need no
+    # re-check and came_from entries are written exactly once.
+    stack = []
+    stack.append(initial)
+    pushed = {initial.hash}
+
+    came_from = {initial.hash: (None, None, initial.depth)}
+    materialized = initial.hash
+
+    while stack:
+        curr = stack.pop()
+        materialize(board, came_from, materialized, curr.hash)
+        materialized = curr.hash
+
+        if curr.hash == goal_board.hash:
+            return curr.hash, came_from
+
+        successors = curr.generate_successors(board)
+        for state in successors:
+            if state.hash in pushed:
+                continue
+            pushed.add(state.hash)
+            came_from[state.hash] = (curr.hash, state.move, state.depth)
+            stack.append(state)
+    return None
+    
+
+def output_solution(board, goal_board, algo, output_file):
+    original_stdout = sys.stdout
+
+    if algo == 'dfs':
+        initial = State(0, 0, 0, None, board.hash)
+        result = dfs(board, initial, goal_board)
+    else:
+        man_dist = init_manhattan_distance(board)
+        initial = State(man_dist, man_dist, 0, None, board.hash)
+        if algo == 'hdastar':
+            # Imported here so hrd_parallel can import State and
+            # materialize from this module without a cycle.
+            from hrd_parallel import hda_star
+            result = hda_star(board, initial, goal_board)
+        else:
+            result = astar(board, initial, goal_board)
+
+    with open(output_file, 'w') as sys.stdout:
+        if result:
+            goal_hash, came_from = result
+
+            moves = []
+            state_hash = goal_hash
+            while came_from[state_hash][0] is not None:
+                parent_hash, move, _ = came_from[state_hash]
+                moves.append(move)
+                state_hash = parent_hash
+            moves.reverse()
+
+            # The search leaves the shared board materialized at the goal
+            # state; rewind it to the root and replay the winning moves,
+            # printing the board after each one.
+            for uid, old, new in reversed(moves):
+                board.apply_move(uid, old)
+            board.display()
+            print("")
+            for uid, old, new in moves:
+                board.apply_move(uid, new)
+                board.display()
+                print("")
+        else:
+            print("No solution")
+    
+    sys.stdout = original_stdout
+    
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--inputfile",
+        type=str,
+        required=True,
+        help="The input file that contains the puzzles."
+    )
+    parser.add_argument(
+        "--outputfile",
+        type=str,
+        required=True,
+        help="The output file that contains the solution."
+    )
+    parser.add_argument(
+        "--algo",
+        type=str,
+        required=True,
+        choices=['astar', 'hdastar', 'dfs'],
+        help="The searching algorithm."
+    )
+    args = parser.parse_args()
+
+    # read the board from the file
+    board, goal_board = read_from_file(args.inputfile)
     output_solution(board, goal_board, args.algo, args.outputfile)
\ No newline at end of file
@@ -0,0 +1,81 @@
+"""
+Move generation kernel for the Hua Rong Dao solver.
+
+The kernel operates on plain integers only (the empty-cell bitmask plus
+flat per-piece coordinate and kind lists), so Numba can compile it in
+nopython mode when it is installed. cache=True persists the compiled
+kernel across runs to avoid paying the compile time on every solve.
+Without Numba the same function runs as ordinary Python and the solver
+works unchanged.
+"""
+
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+
+        def decorate(func):
+            return func
+        return decorate
+
+# Integer piece kinds used by the kernel.
+KIND_2_BY_2 = 0
+KIND_SINGLE = 1
+KIND_H = 2
+KIND_V = 3
+
+# (width, height) of each piece kind.
+SIZES = ((2, 2), (1, 1), (2, 1), (1, 2))
+
+# For each piece kind, the four slide directions as
+# (dx, dy, ox1, oy1, ox2, oy2): the anchor delta of the move plus the
+# one or two cells (relative to the anchor) the piece slides into, which
+# must be empty. Single-cell checks repeat the same cell so every entry
+# has the same shape and the whole table stays a homogeneous tuple the
+# JIT can unpack without branching on length.
+MOVES = (
+    ((-1, 0, -1, 0, -1, 1), (0, -1, 0, -1, 1, -1),
+     (1, 0, 2, 0, 2, 1), (0, 1, 0, 2, 1, 2)),       # 2x2
+    ((-1, 0, -1, 0, -1, 0), (0, -1, 0, -1, 0, -1),
+     (1, 0, 1, 0, 1, 0), (0, 1, 0, 1, 0, 1)),       # single
+    ((-1, 0, -1, 0, -1, 0), (0, -1, 0, -1, 1, -1),
+     (1, 0, 2, 0, 2, 0), (0, 1, 0, 1, 1, 1)),       # horizontal
+    ((-1, 0, -1, 0, -1, 1), (0, -1, 0, -1, 0, -1),
+     (1, 0, 1, 0, 1, 1), (0, 1, 0, 2, 0, 2)),       # vertical
+)
+
+
+@njit(cache=True)
+def gen_moves(empty, width, height, xs, ys, kinds):
+    """
+    Return the legal moves on a board as a list of (piece_index, new_x,
+    new_y) triples.
+
+    :param empty: Bitmask with bit y * width + x set for each empty cell.
+    :param width: The board width.
+    :param height: The board height.
+    :param xs: The x coordinate of each piece's top-left corner.
+    :param ys: The y coordinate of each piece's top-left corner.
+    :param kinds: The KIND_* code of each piece.
+    """
+    moves = []
+    for i in range(len(xs)):
+        x = xs[i]
+        y = ys[i]
+        kind = kinds[i]
+        max_x = width - SIZES[kind][0]
+        max_y = height - SIZES[kind][1]
+        idx = y * width + x
+
+        for dx, dy, ox1, oy1, ox2, oy2 in MOVES[kind]:
+            new_x = x + dx
+            new_y = y + dy
+            if new_x < 0 or new_y < 0 or new_x > max_x or new_y > max_y:
+                continue
+            need = (1 << (idx + oy1 * width + ox1)) | (1 << (idx + oy2 * width + ox2))
+            if (empty & need) == need:
+                moves.append((i, new_x, new_y))
+
+    return moves
@@ -0,0 +1,174 @@
+"""
+Hash-distributed parallel A* (HDA*) for the Hua Rong Dao solver.
+
+OPEN is sharded across worker threads by state hash: every state has one
+owning worker (hash % N), successors are routed to their owner's inbox
+queue, and each worker keeps a local heap, best-depth table and board
+clone. Because workers pop in local f-order, a state can be expanded
+with a suboptimal g while a better path to it is still in flight, so an
+incoming message that improves on g_best always reopens the state. That
+rules out reconstructing positions by replaying the came_from tree (a
+reopened entry may be rewritten under another worker's feet), so each
+message carries the full piece-position snapshot instead and expansion
+just loads it into the worker's board clone.
+
+A shared incumbent records the best goal found; workers prune anything
+with f at or above it, and the search ends when every routed state has
+been consumed, at which point the incumbent is optimal. came_from
+entries are only ever written by their owner and only read after the
+workers have joined, and every rewrite strictly lowers the recorded
+depth, so the final parent walk is acyclic and yields a path no longer
+than the incumbent depth.
+
+On CPython the threads serialize on the GIL, so this wins little unless
+the move kernel is Numba-compiled (which releases the GIL); the sharding
+itself is what keeps the workers from contending on one OPEN list.
+"""
+
+import heapq
+import itertools
+import os
+import queue
+import threading
+
+from hrd import State
+
+
+def hda_star(board, initial, goal_board, num_workers=None):
+    """
+    Run HDA* from the initial state and return (goal_hash, came_from)
+    like astar, with the board left materialized at the goal, or None if
+    there is no solution.
+
+    :param board: The board, materialized at the initial state.
+    :type board: Board
+    :param initial: The initial state.
+    :type initial: State
+    :param goal_board: The goal board.
+    :type goal_board: Board
+    :param num_workers: Worker thread count; defaults to os.cpu_count().
+    :type num_workers: Optional[int]
+    """
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+
+    goal_hash = goal_board.hash
+    came_from = {}
+    inboxes = [queue.Queue() for _ in range(num_workers)]
+    lock = threading.Lock()
+    # Number of routed states not yet consumed by their owner; the
+    # search is exhausted when it reaches zero.
+    pending = [0]
+    # Best goal found so far as [f, hash]; f equals depth at a goal
+    # since the heuristic is zero there.
+    incumbent = [float('inf'), None]
+    done = threading.Event()
+
+    def send(msg):
+        with lock:
+            pending[0] += 1
+        inboxes[msg[4] % num_workers].put(msg)
+
+    def consume():
+        with lock:
+            pending[0] -= 1
+            if pending[0] == 0:
+                done.set()
+
+    def worker(index):
+        inbox = inboxes[index]
+        local_board = board.clone()
+        width = local_board.width
+        kinds = local_board.kinds
+        occs = local_board.occs
+        heap = []
+        counter = itertools.count()
+        g_best = {}
+
+        def receive(msg):
+            hfn, depth, move, parent_hash, state_hash, xs, ys, empty = msg
+            # A strictly better g reopens the state even if it was
+            # already expanded; anything else is a stale duplicate.
+            if g_best.get(state_hash, float('inf')) <= depth:
+                consume()
+                return
+            g_best[state_hash] = depth
+            came_from[state_hash] = (parent_hash, move, depth)
+            heapq.heappush(heap, (depth + hfn, -depth, next(counter),
+                                  hfn, depth, state_hash, xs, ys, empty))
+
+        while not done.is_set():
+            while True:
+                try:
+                    receive(inbox.get_nowait())
+                except queue.Empty:
+                    break
+
+            if not heap:
+                # Idle: block briefly for new work, then re-check done.
+                try:
+                    receive(inbox.get(timeout=0.01))
+                except queue.Empty:
+                    pass
+                continue
+
+            f, _, _, hfn, depth, state_hash, xs, ys, empty = heapq.heappop(heap)
+            if g_best[state_hash] < depth:
+                consume()
+                continue
+
+            if f >= incumbent[0]:
+                consume()
+                continue
+
+            if state_hash == goal_hash:
+                with lock:
+                    if depth < incumbent[0]:
+                        incumbent[0] = depth
+                        incumbent[1] = state_hash
+                consume()
+                continue
+
+            local_board.xs[:] = xs
+            local_board.ys[:] = ys
+            local_board.hash = state_hash
+            local_board.empty = empty
+
+            curr = State(hfn, f, depth, None, state_hash)
+            for state in curr.generate_successors(local_board):
+                if state.f >= incumbent[0]:
+                    continue
+                uid, old, new = state.move
+                kind = kinds[uid]
+                old_idx = old[1] * width + old[0]
+                new_idx = new[1] * width + new[0]
+                send((state.hfn, state.depth, state.move, state_hash, state.hash,
+                      xs[:uid] + (new[0],) + xs[uid + 1:],
+                      ys[:uid] + (new[1],) + ys[uid + 1:],
+                      empty ^ occs[kind][old_idx] ^ occs[kind][new_idx]))
+            consume()
+
+    send((initial.hfn, initial.depth, None, None, initial.hash,
+          tuple(board.xs), tuple(board.ys), board.empty))
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(num_workers)]
+    for thread in threads:
+        thread.start()
+    done.wait()
+    for thread in threads:
+        thread.join()
+
+    if incumbent[1] is None:
+        return None
+
+    # Replay the winning path so the caller's board ends up materialized
+    # at the goal, matching the serial searches.
+    moves = []
+    state_hash = incumbent[1]
+    while came_from[state_hash][0] is not None:
+        parent_hash, move, _ = came_from[state_hash]
+        moves.append(move)
+        state_hash = parent_hash
+    for uid, old, new in reversed(moves):
+        board.apply_move(uid, new)
+    return incumbent[1], came_from